@@ -0,0 +1,425 @@
+import os
+import multiprocessing
+import tempfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import yaml
+
+from src.stat_module import week_start_date
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Sport names found in exports mapped to the activity keys of the training schema
+SPORT_ACTIVITIES = {
+    'running': 'footing',
+    'run': 'footing',
+    'trail_running': 'trail_running',
+    'trail running': 'trail_running',
+    'trail': 'trail_running',
+    'biking': 'bike',
+    'cycling': 'bike',
+    'ride': 'bike',
+    'bike': 'bike',
+}
+DEFAULT_ACTIVITY = 'others'
+SUPPORTED_EXTENSIONS = ('.gpx', '.tcx')
+
+
+def _local_name(tag: str) -> str:
+    """
+    Strip the XML namespace from a tag.
+    """
+    return tag.rsplit('}', 1)[-1]
+
+
+def _parse_time(text: str) -> float:
+    """
+    Convert an ISO 8601 timestamp to UTC epoch seconds.
+    """
+    moment = datetime.fromisoformat(text.strip().replace('Z', '+00:00'))
+
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+
+    return moment.timestamp()
+
+
+def _to_float(text: Optional[str]) -> float:
+    """
+    Convert optional text to float, NaN when missing.
+    """
+    return float(text) if text not in (None, '') else np.nan
+
+
+def parse_track_points(file_path: str) -> Dict[str, Any]:
+    """
+    Stream-parse the track points of a GPX or TCX file.
+
+    The file is read incrementally with iterparse and each point element is
+    detached from the tree once read, so no element tree is built: memory is
+    bounded by the four coordinate lists, O(points) floats.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to a .gpx or .tcx file.
+
+    The name is read from the GPX track (falling back to the file metadata)
+    or from the TCX activity notes.
+
+    Returns
+    -------
+    dict
+        'name' and 'sport' (None when absent) and the 'lat', 'lon',
+        'ele' and 'time' arrays (NaN for missing values, time in epoch seconds).
+    """
+    name = metadata_name = sport = None
+    lat, lon, ele, times = [], [], [], []
+    point: Dict[str, Any] = {}
+    in_point = False
+    # Open elements, from the root down to the current one
+    stack = []
+
+    for event, elem in ET.iterparse(file_path, events=('start', 'end')):
+        tag = _local_name(elem.tag)
+
+        if event == 'start':
+            stack.append(elem)
+
+            if tag in ('trkpt', 'Trackpoint'):
+                in_point = True
+                point = {'lat': elem.get('lat'), 'lon': elem.get('lon')}
+            elif tag == 'Activity' and sport is None:
+                sport = elem.get('Sport')
+            continue
+        stack.pop()
+        parent = _local_name(stack[-1].tag) if stack else None
+
+        if in_point:
+            if tag in ('trkpt', 'Trackpoint'):
+                lat.append(_to_float(point.get('lat')))
+                lon.append(_to_float(point.get('lon')))
+                ele.append(_to_float(point.get('ele')))
+                times.append(_parse_time(point['time']) if point.get('time') else np.nan)
+                in_point = False
+                stack[-1].remove(elem)
+            elif tag in ('ele', 'AltitudeMeters'):
+                point['ele'] = elem.text
+            elif tag in ('time', 'Time'):
+                point['time'] = elem.text
+            elif tag == 'LatitudeDegrees':
+                point['lat'] = elem.text
+            elif tag == 'LongitudeDegrees':
+                point['lon'] = elem.text
+        elif not elem.text:
+            continue
+        elif (tag, parent) in (('name', 'trk'), ('Notes', 'Activity')) and name is None:
+            name = elem.text.strip()
+        elif (tag, parent) == ('name', 'metadata') and metadata_name is None:
+            metadata_name = elem.text.strip()
+        elif (tag, parent) == ('type', 'trk') and sport is None:
+            sport = elem.text.strip()
+
+    return {
+        'name': name or metadata_name,
+        'sport': sport,
+        'lat': np.array(lat, dtype=float),
+        'lon': np.array(lon, dtype=float),
+        'ele': np.array(ele, dtype=float),
+        'time': np.array(times, dtype=float),
+    }
+
+
+def haversine_km(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """
+    Great-circle distances between consecutive points, vectorized.
+
+    Parameters
+    ----------
+    lat, lon : np.ndarray
+        Coordinates in degrees.
+
+    Returns
+    -------
+    np.ndarray
+        The len(lat) - 1 distances in kilometers.
+    """
+    lat, lon = np.radians(lat), np.radians(lon)
+    a = (np.sin(np.diff(lat) / 2) ** 2
+         + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(np.diff(lon) / 2) ** 2)
+
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def track_stats(points: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Compute distance, elevation gain and duration of a track.
+
+    Points without position are left out of the distance, and points
+    without elevation out of the gain.
+
+    Parameters
+    ----------
+    points : dict
+        Output of parse_track_points().
+
+    Returns
+    -------
+    dict
+        Distance (km), positive elevation gain (m) and duration (min).
+    """
+    located = ~(np.isnan(points['lat']) | np.isnan(points['lon']))
+    distance = haversine_km(points['lat'][located], points['lon'][located]).sum()
+    ele = points['ele'][~np.isnan(points['ele'])]
+    gain = np.clip(np.diff(ele), 0, None).sum()
+    times = points['time'][~np.isnan(points['time'])]
+    duration = (times.max() - times.min()) / 60 if len(times) else 0.0
+
+    return {'distance_km': float(distance), 'elevation_m': float(gain), 'time_min': float(duration)}
+
+
+def parse_activity_file(file_path: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    Turn one GPX or TCX export into a session of the training schema.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to a .gpx or .tcx file.
+
+    Returns
+    -------
+    tuple or None
+        (activity, session) where the session holds the same keys as
+        hand-typed ones plus 'start_time' (ISO, UTC) identifying it;
+        None when the file has no timestamped point.
+    """
+    points = parse_track_points(file_path)
+    times = points['time'][~np.isnan(points['time'])]
+
+    if not len(times):
+        return None
+    stats = track_stats(points)
+    sport = (points['sport'] or '').strip().lower()
+    start = datetime.fromtimestamp(times.min(), tz=timezone.utc)
+    session = {
+        'session_description': points['name'] or os.path.splitext(os.path.basename(file_path))[0],
+        'start_time': start.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'distance_km': round(stats['distance_km'], 2),
+        'elevation_m': int(round(stats['elevation_m'])),
+        'time_min': int(round(stats['time_min'])),
+    }
+
+    return SPORT_ACTIVITIES.get(sport, DEFAULT_ACTIVITY), session
+
+
+def _parse_or_error(file_path: str) -> Tuple[Optional[Tuple[str, Dict[str, Any]]], Optional[str]]:
+    """
+    Run parse_activity_file(), returning (result, None) or (None, error message).
+    """
+    try:
+        result = parse_activity_file(file_path)
+    except (ET.ParseError, ValueError, OSError) as exc:
+        return None, f"{type(exc).__name__}: {exc}"
+
+    if result is None:
+        return None, "no timestamped track points"
+
+    return result, None
+
+
+def parse_activity_files(file_paths: Sequence[str], max_workers: Optional[int] = None
+                         ) -> Tuple[List[Tuple[str, Dict[str, Any]]], List[Tuple[str, str]]]:
+    """
+    Parse several export files in parallel worker processes.
+
+    A file that cannot be read or parsed, or has no timestamped point,
+    is skipped and reported, without stopping the others.
+
+    Parameters
+    ----------
+    file_paths : sequence of str
+        Paths to .gpx or .tcx files.
+    max_workers : int, optional
+        Number of worker processes (default: one per CPU).
+
+    Returns
+    -------
+    tuple
+        The (activity, session) pairs, in the order of file_paths, and the
+        (path, error) pairs of the files that were skipped.
+
+    Raises
+    ------
+    ValueError
+        If a file does not have a .gpx or .tcx extension.
+    """
+    unsupported = [p for p in file_paths if os.path.splitext(p)[1].lower() not in SUPPORTED_EXTENSIONS]
+
+    if unsupported:
+        raise ValueError(f"Unsupported file type (expected .gpx or .tcx): {', '.join(unsupported)}")
+
+    if len(file_paths) <= 1 or max_workers == 1:
+        results = [_parse_or_error(p) for p in file_paths]
+    else:
+        # Spawn rather than fork, so callers holding threads or event loops stay safe
+        context = multiprocessing.get_context('spawn')
+
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+            results = list(executor.map(_parse_or_error, file_paths))
+    sessions = [result for result, _ in results if result is not None]
+    failures = [(path, error) for path, (_, error) in zip(file_paths, results) if error is not None]
+
+    return sessions, failures
+
+
+def merge_sessions(weeks: List[Dict[str, Any]],
+                   sessions: Sequence[Tuple[str, Dict[str, Any]]],
+                   tz: Optional[tzinfo] = None) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Merge imported sessions into the weekly structure used by collect_all_stats().
+
+    Each session goes to the week starting on the Monday of its local start
+    date, created when missing; when several weeks share that first day, the
+    first of them receives it and the others are kept as they are. Sessions
+    whose 'start_time' (UTC) is already present are skipped, so importing the
+    same files twice does not duplicate them.
+
+    Parameters
+    ----------
+    weeks : list of dict
+        Each week's activity dictionary; left unmodified.
+    sessions : sequence of tuple
+        (activity, session) pairs from parse_activity_files().
+    tz : tzinfo, optional
+        Time zone giving the local start date (default: the system's).
+
+    Returns
+    -------
+    tuple
+        The merged weeks sorted by first day, and the number of sessions added.
+    """
+    merged = []
+    by_date = {}
+    seen = set()
+
+    for week in weeks:
+        copy = {k: (list(v) if isinstance(v, list) else v) for k, v in week.items()}
+        merged.append(copy)
+        by_date.setdefault(week_start_date(week), copy)
+
+        for value in copy.values():
+            if isinstance(value, list):
+                seen.update(s.get('start_time') for s in value if isinstance(s, dict))
+    added = 0
+
+    for activity, session in sessions:
+        if session['start_time'] in seen:
+            continue
+        seen.add(session['start_time'])
+        start = datetime.fromisoformat(session['start_time'].replace('Z', '+00:00'))
+        day = start.astimezone(tz).date()
+        monday = day - timedelta(days=day.weekday())
+
+        if monday not in by_date:
+            by_date[monday] = {'week_first_day': monday.isoformat()}
+            merged.append(by_date[monday])
+        by_date[monday].setdefault(activity, []).append(session)
+        added += 1
+
+    return sorted(merged, key=week_start_date), added
+
+
+def import_activity_files(yaml_path: str, file_paths: Sequence[str],
+                          output_path: Optional[str] = None,
+                          max_workers: Optional[int] = None,
+                          tz: Optional[tzinfo] = None) -> Tuple[int, List[Tuple[str, str]]]:
+    """
+    Top-level function: import export files into a training YAML file.
+
+    Only the 'data' list of the document is replaced; other top-level keys
+    are kept. The file is written to a temporary file then moved into place,
+    so an interrupted import never leaves it half-written. YAML comments are
+    not preserved. Files that fail to parse or have no timestamped point
+    are skipped and reported.
+
+    Parameters
+    ----------
+    yaml_path : str
+        Path to the training YAML file; created when missing.
+    file_paths : sequence of str
+        Paths to .gpx or .tcx files.
+    output_path : str, optional
+        Where to write the merged data (default: yaml_path).
+    max_workers : int, optional
+        Number of worker processes (default: one per CPU).
+    tz : tzinfo, optional
+        Time zone assigning sessions to weeks (default: the system's).
+
+    Returns
+    -------
+    tuple
+        Number of sessions added, and the (path, error) pairs of the files
+        that were skipped.
+
+    Raises
+    ------
+    ValueError
+        If a file does not have a .gpx or .tcx extension.
+    """
+    sessions, failures = parse_activity_files(file_paths, max_workers)
+    document = {}
+
+    if os.path.exists(yaml_path):
+        with open(yaml_path, 'r', encoding='utf-8') as file:
+            document = yaml.safe_load(file) or {}
+    weeks, added = merge_sessions(document.get('data') or [], sessions, tz)
+    document['data'] = weeks
+    target = output_path or yaml_path
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(target)), suffix='.yml')
+
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            yaml.safe_dump(document, file, sort_keys=False, allow_unicode=True)
+
+        if os.path.exists(target):
+            os.chmod(tmp_path, os.stat(target).st_mode & 0o7777)
+        else:
+            # mkstemp creates 0600 files; give a new file the usual umask-based mode
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp_path, 0o666 & ~umask)
+        os.replace(tmp_path, target)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    return added, failures
+
+
+if __name__ == "__main__":
+    import argparse
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+    parser = argparse.ArgumentParser(description="Import GPX/TCX activity exports into training data.")
+    parser.add_argument('yaml_path', help="Path to the training YAML file")
+    parser.add_argument('files', nargs='+', help="GPX or TCX files to import")
+    parser.add_argument('--output', help="Write to this file instead of yaml_path")
+    parser.add_argument('--workers', type=int, help="Number of worker processes")
+    parser.add_argument('--tz', help="IANA time zone assigning sessions to weeks, e.g. Europe/Paris "
+                                     "(default: the system's)")
+    args = parser.parse_args()
+
+    try:
+        tz = ZoneInfo(args.tz) if args.tz else None
+    except (ZoneInfoNotFoundError, ValueError):
+        parser.error(f"unknown time zone: {args.tz}")
+    count, failures = import_activity_files(args.yaml_path, args.files, args.output, args.workers, tz)
+
+    for path, error in failures:
+        print(f"Skipped {path}: {error}")
+    print(f"{count} session(s) imported")
@@ -0,0 +1,457 @@
+import re
+import calendar
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.stat_module import load_training_data, week_start_date, collect_all_stats
+
+METRICS = ['time_min', 'distance_km', 'elevation_m', 'load']
+TOTAL = 'week_total'
+
+# Words of a question mapped to a metric, longest phrases first
+METRIC_WORDS = [
+    ('elevation gain', 'elevation_m'),
+    ('elevation', 'elevation_m'),
+    ('climbing', 'elevation_m'),
+    ('d+', 'elevation_m'),
+    ('meters', 'elevation_m'),
+    ('distance', 'distance_km'),
+    ('kilometers', 'distance_km'),
+    ('km', 'distance_km'),
+    ('duration', 'time_min'),
+    ('time', 'time_min'),
+    ('minutes', 'time_min'),
+    ('hours', 'time_min'),
+    ('load', 'load'),
+]
+# Sport words of a question mapped to the activity name parts they select
+SPORT_WORDS = {
+    'run': ('running', 'footing'),
+    'runs': ('running', 'footing'),
+    'ran': ('running', 'footing'),
+    'running': ('running', 'footing'),
+    'jog': ('footing',),
+    'jogging': ('footing',),
+    'footing': ('footing',),
+    'trail': ('trail',),
+    'race': ('race',),
+    'races': ('race',),
+    'interval': ('interval',),
+    'intervals': ('interval',),
+    'bike': ('bike', 'biking', 'cycling'),
+    'biking': ('bike', 'biking', 'cycling'),
+    'cycling': ('bike', 'biking', 'cycling'),
+    'ride': ('bike', 'biking', 'cycling'),
+    'rode': ('bike', 'biking', 'cycling'),
+    'swim': ('swim', 'swimming'),
+    'swam': ('swim', 'swimming'),
+    'swimming': ('swim', 'swimming'),
+    'hike': ('hike', 'hiking'),
+    'hiking': ('hike', 'hiking'),
+    'ski': ('ski', 'skiing'),
+    'skiing': ('ski', 'skiing'),
+}
+COMPARISONS = [
+    (r'\b(?:at least|no less than)\b|>=', '>='),
+    (r'\b(?:at most|no more than)\b|<=', '<='),
+    (r'\b(?:above|over|more than|greater than)\b|>', '>'),
+    (r'\b(?:below|under|less than)\b|<', '<'),
+]
+# A number, possibly with thousands separators ("1,000")
+NUMBER = r'(\d+(?:,\d+)*(?:\.\d+)?)'
+MONTHS = {name.lower(): i for i, name in enumerate(calendar.month_name) if name}
+MONTHS.update({name.lower(): i for i, name in enumerate(calendar.month_abbr) if name})
+ISO_DATE = r'(\d{4}-\d{2}-\d{2})'
+MONTH = r'(?:' + '|'.join(sorted(MONTHS, key=len, reverse=True)) + r')\b\.?(?:\s+\d{4}\b)?'
+# Month names that are unambiguous on their own; abbreviations and "may"
+# need "in" before them or a year after them
+BARE_MONTH = r'(?:' + '|'.join(n.lower() for n in calendar.month_name if n and n != 'May') + r')\b'
+# An ISO date, a month with an optional year, or a year
+PERIOD = r'(\d{4}-\d{2}-\d{2}|' + MONTH + r'|\d{4}\b)'
+
+
+class AggregateIndex:
+    """
+    Precomputed aggregates answering range totals and threshold queries.
+
+    Weeks are sorted by first day. For each ``<activity>_<metric>`` column
+    of collect_all_stats() (weekly totals included, as ``week_total``),
+    the index keeps:
+
+    - a prefix sum, so the total over any run of weeks is one subtraction;
+    - the weeks sorted by value, so threshold queries are a binary search.
+
+    Parameters
+    ----------
+    weeks : list of dict
+        Each week's activity dictionary.
+    """
+
+    def __init__(self, weeks: List[Dict[str, Any]]):
+        weeks = sorted(weeks, key=week_start_date)
+        df = collect_all_stats(weeks).fillna(0)
+        self.dates = [week_start_date(w) for w in weeks]
+        self.activities = sorted(
+            col[:-len('_time_min')] for col in df.columns
+            if col.endswith('_time_min') and not col.startswith(TOTAL)
+        )
+        self.values: Dict[str, np.ndarray] = {}
+        self.prefix: Dict[str, np.ndarray] = {}
+        self._sorted: Dict[Tuple[Tuple[str, ...], str], Tuple[np.ndarray, np.ndarray]] = {}
+
+        for activity in self.activities + [TOTAL]:
+            for metric in METRICS:
+                column = f"{activity}_{metric}"
+                values = df[column].to_numpy(dtype=float) if column in df else np.zeros(len(weeks))
+                self.values[column] = values
+                self.prefix[column] = np.concatenate(([0.0], np.cumsum(values)))
+
+    def _week_bounds(self, start: Optional[date], end: Optional[date]) -> Tuple[int, int]:
+        """
+        Return the [lo, hi) slice of weeks whose first day lies in [start, end].
+        """
+        lo = 0 if start is None else bisect_left(self.dates, start)
+        hi = len(self.dates) if end is None else bisect_right(self.dates, end)
+
+        return lo, max(lo, hi)
+
+    def range_total(self, activities: Sequence[str], metric: str,
+                    start: Optional[date] = None, end: Optional[date] = None) -> float:
+        """
+        Sum a metric over some activities and a date range.
+
+        Parameters
+        ----------
+        activities : sequence of str
+            Activities to add up, or [TOTAL] for all of them.
+        metric : str
+            One of METRICS.
+        start, end : date or None
+            Inclusive bounds on the weeks' first day; None leaves the side open.
+
+        Returns
+        -------
+        float
+            The summed metric.
+        """
+        lo, hi = self._week_bounds(start, end)
+
+        return float(sum(self.prefix[f"{a}_{metric}"][hi] - self.prefix[f"{a}_{metric}"][lo]
+                         for a in activities))
+
+    def _sorted_values(self, activities: Sequence[str], metric: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return (values, week positions) sorted by the weekly sum over activities.
+
+        Built on first use for each activity group, then reused.
+        """
+        key = (tuple(sorted(activities)), metric)
+
+        if key not in self._sorted:
+            weekly = sum((self.values[f"{a}_{metric}"] for a in key[0]), np.zeros(len(self.dates)))
+            order = np.argsort(weekly, kind='stable')
+            self._sorted[key] = (weekly[order], order)
+
+        return self._sorted[key]
+
+    def weeks_matching(self, activities: Sequence[str], metric: str, comparison: str, value: float,
+                       start: Optional[date] = None, end: Optional[date] = None) -> List[date]:
+        """
+        List the weeks whose summed metric satisfies a threshold.
+
+        Parameters
+        ----------
+        activities : sequence of str
+            Activities to add up, or [TOTAL] for all of them.
+        metric : str
+            One of METRICS.
+        comparison : str
+            One of '>', '>=', '<', '<='.
+        value : float
+            Threshold.
+        start, end : date or None
+            Inclusive bounds on the weeks' first day; None leaves the side open.
+
+        Returns
+        -------
+        list of date
+            First days of the matching weeks, in chronological order.
+        """
+        values, order = self._sorted_values(activities, metric)
+
+        if comparison == '>':
+            positions = order[np.searchsorted(values, value, side='right'):]
+        elif comparison == '>=':
+            positions = order[np.searchsorted(values, value, side='left'):]
+        elif comparison == '<':
+            positions = order[:np.searchsorted(values, value, side='left')]
+        elif comparison == '<=':
+            positions = order[:np.searchsorted(values, value, side='right')]
+        else:
+            raise ValueError(f"Unknown comparison: {comparison}")
+        lo, hi = self._week_bounds(start, end)
+
+        return [self.dates[i] for i in sorted(positions) if lo <= i < hi]
+
+
+def build_aggregate_index(yaml_path: str) -> AggregateIndex:
+    """
+    Load a YAML file and build its aggregate index.
+
+    Parameters
+    ----------
+    yaml_path : str
+        Path to the YAML file.
+
+    Returns
+    -------
+    AggregateIndex
+        Index over all weeks of the file.
+    """
+    return AggregateIndex(load_training_data(yaml_path))
+
+
+def _match_activities(text: str, activities: Sequence[str]) -> List[str]:
+    """
+    Find the activities named in a question.
+
+    A full activity name ("trail running" or "trail_running") selects that
+    activity alone. Otherwise a sport word selects every activity with a
+    matching name part ("running" or "ran" selects footing, trail_running
+    and trail_running_race), and any other word selects the activities
+    it starts ("interval"). No sport named means all activities.
+
+    Raises
+    ------
+    ValueError
+        If the question names a sport none of the activities match.
+    """
+    for activity in sorted(activities, key=len, reverse=True):
+        if re.search(r'\b' + re.escape(activity.replace('_', ' ')) + r'\b', text.replace('_', ' ')):
+            return [activity]
+
+    for word in re.findall(r'[a-z]+', text):
+        if word in SPORT_WORDS:
+            group = [a for a in activities if set(a.split('_')) & set(SPORT_WORDS[word])]
+
+            if not group:
+                raise ValueError(f"No activity matches '{word}' in question: {text}")
+        else:
+            group = [a for a in activities if a == word or a.startswith(word + '_')]
+
+        if group:
+            return group
+
+    return [TOTAL]
+
+
+def _match_metric(text: str) -> Tuple[str, float]:
+    """
+    Find the metric named in a question, with the factor converting its unit.
+    """
+    for phrase, metric in METRIC_WORDS:
+        if re.search(r'(?<![a-z])' + re.escape(phrase) + r'(?![a-z])', text):
+            return metric, 60.0 if phrase == 'hours' else 1.0
+    raise ValueError(f"No metric found in question: {text}")
+
+
+def _period_bounds(expression: str, index: AggregateIndex,
+                   after: Optional[date] = None) -> Tuple[date, date]:
+    """
+    Return the first and last day of a period matched by PERIOD.
+
+    A month without a year refers to its next occurrence from ``after``
+    when given, otherwise to its latest occurrence in the index.
+    """
+    if re.fullmatch(ISO_DATE, expression):
+        day = date.fromisoformat(expression)
+
+        return day, day
+
+    if re.fullmatch(r'\d{4}', expression):
+        year = int(expression)
+
+        return date(year, 1, 1), date(year, 12, 31)
+    words = expression.replace('.', ' ').split()
+    month = MONTHS[words[0]]
+
+    if len(words) > 1:
+        year = int(words[1])
+    elif after is not None:
+        year = after.year if month >= after.month else after.year + 1
+    else:
+        years = [d.year for d in index.dates if d.month == month]
+        year = max(years) if years else (index.dates[-1].year if index.dates else date.today().year)
+
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def _match_period(text: str, index: AggregateIndex) -> Tuple[Optional[date], Optional[date]]:
+    """
+    Find the date range of a question.
+
+    A period is an ISO date, a month with an optional year, or a year.
+    Understands "between <period> and <period>", "from <period> to <period>",
+    "since <period>", "after <period>", "until <period>", "before <period>",
+    "in <year>", "in <month> [<year>]" and "<month> <year>"; a full month
+    name other than "may" is also understood on its own. "after" and
+    "before" exclude the period itself. In a range, a month without year
+    after "and"/"to" is its next occurrence from the start of the range.
+
+    Raises
+    ------
+    ValueError
+        If a range keyword is not followed by a period, or a range ends
+        before it starts.
+    """
+    match = re.search(r'\b(?:between|from)\s+' + PERIOD + r'\s+(?:and|to)\s+' + PERIOD, text)
+
+    if match:
+        start = _period_bounds(match.group(1), index)[0]
+        end = _period_bounds(match.group(2), index, after=start)[1]
+
+        if start > end:
+            raise ValueError(f"Range ends before it starts in question: {text}")
+
+        return start, end
+    match = re.search(r'\b(since|after|until|before)\s+' + PERIOD, text)
+
+    if match:
+        first, last = _period_bounds(match.group(2), index)
+
+        return {
+            'since': (first, None),
+            'after': (last + timedelta(days=1), None),
+            'until': (None, last),
+            'before': (None, first - timedelta(days=1)),
+        }[match.group(1)]
+
+    if re.search(r'\b(?:since|after|until|before|between)\b', text):
+        raise ValueError(f"No date or month found after range keyword in question: {text}")
+    # Ending on a digit forces MONTH to include its year
+    match = (re.search(r'\bin\s+(' + MONTH + ')', text)
+             or re.search(r'\b(' + MONTH + r'(?<=\d))', text)
+             or re.search(r'\b(' + BARE_MONTH + ')', text)
+             or re.search(r'\bin\s+(\d{4})\b', text))
+
+    if match:
+        return _period_bounds(match.group(1), index)
+
+    return None, None
+
+
+def parse_query(question: str, index: AggregateIndex) -> Dict[str, Any]:
+    """
+    Compile a question into an operation on the aggregate index.
+
+    Two kinds of questions are understood:
+
+    - totals, e.g. "total trail elevation in January";
+    - thresholds, e.g. "weeks above 1000 load".
+
+    Parameters
+    ----------
+    question : str
+        The question, in English.
+    index : AggregateIndex
+        Index whose activities and dates resolve the question.
+
+    Returns
+    -------
+    dict
+        The operation ('total' or 'weeks'), activities, metric, start, end,
+        and for thresholds the comparison and value (in the metric's unit).
+
+    Raises
+    ------
+    ValueError
+        If the question cannot be parsed.
+    """
+    text = question.lower().strip()
+    metric, factor = _match_metric(text)
+    start, end = _match_period(text, index)
+    query = {
+        'op': 'total',
+        'activities': _match_activities(text, index.activities),
+        'metric': metric,
+        'start': start,
+        'end': end,
+    }
+
+    if re.search(r'\bweeks?\b', text):
+        for pattern, comparison in COMPARISONS:
+            match = re.search(r'(?:' + pattern + r')\s*' + NUMBER, text)
+
+            if match:
+                number = match.group(1)
+
+                if not re.fullmatch(r'\d{1,3}(?:,\d{3})*(?:\.\d+)?|\d+(?:\.\d+)?', number):
+                    raise ValueError(f"Invalid number '{number}' in question: {question}")
+                query.update(op='weeks', comparison=comparison,
+                             value=float(number.replace(',', '')) * factor)
+
+                return query
+        raise ValueError(f"No threshold found in question: {question}")
+
+    return query
+
+
+def execute_query(query: Dict[str, Any], index: AggregateIndex) -> Any:
+    """
+    Run a query compiled by parse_query() on the aggregate index.
+
+    Returns
+    -------
+    float or list of date
+        The total for 'total' queries, the matching weeks for 'weeks' queries.
+    """
+    if query['op'] == 'total':
+        return index.range_total(query['activities'], query['metric'], query['start'], query['end'])
+
+    return index.weeks_matching(query['activities'], query['metric'], query['comparison'],
+                                query['value'], query['start'], query['end'])
+
+
+def answer_question(question: str, index: AggregateIndex) -> str:
+    """
+    Answer a question about the training data in one sentence.
+
+    Parameters
+    ----------
+    question : str
+        The question, in English.
+    index : AggregateIndex
+        Index built from the training data.
+
+    Returns
+    -------
+    str
+        The answer.
+    """
+    query = parse_query(question, index)
+    result = execute_query(query, index)
+    activities = 'all activities' if query['activities'] == [TOTAL] else ', '.join(query['activities'])
+    period = ''
+
+    if query['start'] or query['end']:
+        period = f" from {query['start'] or 'the start'} to {query['end'] or 'the end'}"
+
+    if query['op'] == 'total':
+        return f"Total {query['metric']} for {activities}{period}: {result:g}"
+    weeks = ', '.join(d.isoformat() for d in result) or 'none'
+
+    return (f"{len(result)} week(s) with {query['metric']} {query['comparison']} {query['value']:g} "
+            f"for {activities}{period}: {weeks}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ask questions about training data.")
+    parser.add_argument('yaml_path', help="Path to the training YAML file")
+    parser.add_argument('question', nargs='+', help="Question, e.g. 'weeks above 1000 load'")
+    args = parser.parse_args()
+    print(answer_question(' '.join(args.question), build_aggregate_index(args.yaml_path)))
@@ -1,6 +1,7 @@
 import yaml
 import pandas as pd
 from typing import Any, Dict, List, Optional
+from datetime import date
 import re
 
 
@@ -24,6 +25,29 @@ def load_training_data(file_path: str) -> List[Dict[str, Any]]:
     return data['data']
 
 
+def week_start_date(week: Dict[str, Any]) -> date:
+    """
+    Return the first day of a week as a date.
+
+    Parameters
+    ----------
+    week : dict
+        One week's data. Its 'week_first_day' may be an ISO string
+        or a date already parsed by YAML.
+
+    Returns
+    -------
+    date
+        The first day of the week.
+    """
+    value = week.get('week_first_day')
+
+    if isinstance(value, date):
+        return value
+
+    return date.fromisoformat(str(value))
+
+
 def extract_activity_stats(week: Dict[str, Any], activity: str) -> Dict[str, float]:
     """
     Extract summed statistics for a specific activity in a given week.
@@ -0,0 +1,402 @@
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import re
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from src.stat_module import (
+    load_training_data, week_start_date, collect_all_stats, per_sport_stats
+)
+
+logger = logging.getLogger(__name__)
+
+ATHLETE_NAME = re.compile(r'^[A-Za-z0-9_-]+$')
+ROUTE = re.compile(r'^/athletes/([^/]+)/(weekly|sports|range)$')
+REASONS = {
+    200: 'OK',
+    304: 'Not Modified',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    500: 'Internal Server Error',
+}
+
+
+def _to_records(df) -> List[Dict[str, Any]]:
+    """
+    Convert a stats DataFrame into JSON-serializable records.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Output of collect_all_stats() or per_sport_stats().
+
+    Returns
+    -------
+    list of dict
+        One dictionary per row, with missing values replaced by 0.
+    """
+    return df.fillna(0).to_dict(orient='records')
+
+
+def _sport_records(df) -> List[Dict[str, Any]]:
+    """
+    Compute per-sport records with a TOTAL row, even without any activity.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Output of collect_all_stats(), possibly without activity columns.
+
+    Returns
+    -------
+    list of dict
+        Per-sport records; a single TOTAL row of zeros when no activity is found.
+    """
+    if per_sport_stats(df).empty:
+        return [{'activity': 'TOTAL', 'time_min': 0, 'distance_km': 0, 'elevation_m': 0, 'load': 0}]
+
+    return _to_records(per_sport_stats(df, with_total=True))
+
+
+def compute_weekly(yaml_path: str) -> List[Dict[str, Any]]:
+    """
+    Load a YAML file and compute its weekly statistics.
+
+    Parameters
+    ----------
+    yaml_path : str
+        Path to the athlete YAML file.
+
+    Returns
+    -------
+    list of dict
+        Weekly records as produced by collect_all_stats().
+    """
+    return _to_records(collect_all_stats(load_training_data(yaml_path)))
+
+
+def compute_per_sport(yaml_path: str) -> List[Dict[str, Any]]:
+    """
+    Load a YAML file and compute its per-sport totals, TOTAL row included.
+
+    Parameters
+    ----------
+    yaml_path : str
+        Path to the athlete YAML file.
+
+    Returns
+    -------
+    list of dict
+        Per-sport records as produced by per_sport_stats().
+    """
+    return _sport_records(collect_all_stats(load_training_data(yaml_path)))
+
+
+def compute_range(yaml_path: str, start: Optional[date], end: Optional[date]) -> Dict[str, Any]:
+    """
+    Compute weekly and per-sport statistics restricted to a date range.
+
+    Weeks are kept when their first day falls within [start, end];
+    a missing bound leaves that side of the range open.
+
+    Parameters
+    ----------
+    yaml_path : str
+        Path to the athlete YAML file.
+    start : date or None
+        First day of the range (inclusive).
+    end : date or None
+        Last day of the range (inclusive).
+
+    Returns
+    -------
+    dict
+        The range bounds, the matching weeks and the per-sport totals.
+    """
+    weeks = [
+        w for w in load_training_data(yaml_path)
+        if (start is None or week_start_date(w) >= start) and (end is None or week_start_date(w) <= end)
+    ]
+    df = collect_all_stats(weeks)
+
+    return {
+        'start': start.isoformat() if start else None,
+        'end': end.isoformat() if end else None,
+        'weeks': _to_records(df),
+        'sports': _sport_records(df),
+    }
+
+
+def _json_default(value: Any) -> Any:
+    """
+    Serialize numpy scalars and dates left over in the records.
+    """
+    if hasattr(value, 'item'):
+        return value.item()
+
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class HTTPError(Exception):
+    """Error carrying the HTTP status code to answer with."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class StatsServer:
+    """
+    Local asyncio HTTP service exposing the stats API as JSON.
+
+    Each athlete is a YAML file ``<data_dir>/<athlete>.yml``. Available routes:
+
+    - ``GET /athletes/<athlete>/weekly``: weekly statistics.
+    - ``GET /athletes/<athlete>/sports``: per-sport totals with a TOTAL row.
+    - ``GET /athletes/<athlete>/range?start=YYYY-MM-DD&end=YYYY-MM-DD``:
+      weekly and per-sport statistics over a date range.
+
+    Aggregation runs in a worker pool so the event loop never blocks.
+    Responses are cached by athlete file version (modification time and size),
+    and served with an ETag honouring ``If-None-Match``.
+
+    Parameters
+    ----------
+    data_dir : str
+        Directory holding the athlete YAML files.
+    executor : Executor, optional
+        Worker pool used for aggregation (default: a ProcessPoolExecutor).
+    cache_size : int, optional
+        Maximum number of cached responses (default: 256).
+    """
+
+    def __init__(self, data_dir: str, executor: Optional[Executor] = None, cache_size: int = 256):
+        self.data_dir = data_dir
+        self.cache_size = cache_size
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._cache: 'OrderedDict[Tuple, Tuple[bytes, str]]' = OrderedDict()
+        self._pending: Dict[Tuple, asyncio.Future] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8000) -> Tuple[str, int]:
+        """
+        Start listening and return the bound (host, port).
+        """
+        if self._executor is None:
+            # Fork from inside a running event loop can deadlock the workers
+            self._executor = ProcessPoolExecutor(mp_context=multiprocessing.get_context('spawn'))
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        """
+        Stop listening and shut down the worker pool if the server created it.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+        if self._owns_executor and self._executor is not None:
+            executor, self._executor = self._executor, None
+            # Waiting for the workers to exit must not block the event loop
+            await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+
+    async def serve_forever(self, host: str = '127.0.0.1', port: int = 8000):
+        """
+        Start the server and serve requests until cancelled.
+        """
+        await self.start(host, port)
+
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    def _athlete_file(self, athlete: str) -> Tuple[str, Tuple[int, int]]:
+        """
+        Resolve an athlete's YAML file and its current version.
+        """
+        if not ATHLETE_NAME.match(athlete):
+            raise HTTPError(404, f"Unknown athlete: {athlete}")
+        path = os.path.join(self.data_dir, f"{athlete}.yml")
+
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            raise HTTPError(404, f"Unknown athlete: {athlete}")
+
+        return path, (st.st_mtime_ns, st.st_size)
+
+    def _parse_range(self, query: str) -> Tuple[Optional[date], Optional[date]]:
+        """
+        Read the optional start/end dates of a range query.
+        """
+        params = parse_qs(query)
+        bounds = []
+
+        for key in ('start', 'end'):
+            value = params.get(key, [None])[-1]
+
+            try:
+                bounds.append(date.fromisoformat(value) if value else None)
+            except ValueError:
+                raise HTTPError(400, f"Invalid {key} date: {value}")
+
+        if bounds[0] and bounds[1] and bounds[0] > bounds[1]:
+            raise HTTPError(400, "start must not be after end")
+
+        return bounds[0], bounds[1]
+
+    async def _compute(self, key: Tuple, func, *args) -> Tuple[bytes, str]:
+        """
+        Return the cached (body, etag) for key, computing it in the worker pool on a miss.
+
+        Concurrent requests for the same key share a single computation.
+        """
+        if key in self._cache:
+            self._cache.move_to_end(key)
+
+            return self._cache[key]
+
+        if key in self._pending:
+            return await asyncio.shield(self._pending[key])
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending[key] = future
+
+        try:
+            payload = await loop.run_in_executor(self._executor, func, *args)
+            body = json.dumps(payload, default=_json_default).encode('utf-8')
+            entry = (body, '"' + hashlib.sha1(body).hexdigest() + '"')
+            self._cache[key] = entry
+
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            future.set_result(entry)
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark the exception as retrieved when nobody else is waiting on it
+            future.exception()
+            raise
+        finally:
+            del self._pending[key]
+
+        return entry
+
+    async def handle_request(self, method: str, target: str,
+                             headers: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        Answer a single request.
+
+        Parameters
+        ----------
+        method : str
+            HTTP method.
+        target : str
+            Request target (path and query string).
+        headers : dict
+            Request headers, with lower-case names.
+
+        Returns
+        -------
+        tuple
+            Status code, response headers and body.
+        """
+        if method not in ('GET', 'HEAD'):
+            raise HTTPError(405, f"Method not allowed: {method}")
+        url = urlsplit(target)
+        match = ROUTE.match(url.path)
+
+        if not match:
+            raise HTTPError(404, f"Not found: {url.path}")
+        athlete, endpoint = match.groups()
+        path, version = self._athlete_file(athlete)
+
+        if endpoint == 'weekly':
+            body, etag = await self._compute((athlete, version, endpoint), compute_weekly, path)
+        elif endpoint == 'sports':
+            body, etag = await self._compute((athlete, version, endpoint), compute_per_sport, path)
+        else:
+            start, end = self._parse_range(url.query)
+            body, etag = await self._compute((athlete, version, endpoint, start, end),
+                                             compute_range, path, start, end)
+
+        response_headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        candidates = [t.strip() for t in headers.get('if-none-match', '').split(',')]
+
+        if etag in candidates or '*' in candidates:
+            return 304, response_headers, b''
+        response_headers['Content-Type'] = 'application/json'
+
+        return 200, response_headers, body
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Read one HTTP/1.1 request from the connection, answer it and close.
+        """
+        method = request_line = ''
+
+        try:
+            request_line = (await reader.readline()).decode('latin-1').strip()
+            headers = {}
+
+            while True:
+                line = (await reader.readline()).decode('latin-1')
+
+                if line in ('\r\n', '\n', ''):
+                    break
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+            parts = request_line.split(' ')
+
+            if len(parts) != 3:
+                raise HTTPError(400, "Malformed request line")
+            method, target, _ = parts
+            status, response_headers, body = await self.handle_request(method, target, headers)
+        except HTTPError as exc:
+            status, response_headers = exc.status, {'Content-Type': 'application/json'}
+            body = json.dumps({'error': exc.message}).encode('utf-8')
+        except Exception:
+            logger.exception("Error while answering %r", request_line)
+            status, response_headers = 500, {'Content-Type': 'application/json'}
+            body = json.dumps({'error': 'Internal server error'}).encode('utf-8')
+
+        head = [f"HTTP/1.1 {status} {REASONS[status]}"]
+        head += [f"{name}: {value}" for name, value in response_headers.items()]
+        head += [f"Content-Length: {len(body)}", "Connection: close", "", ""]
+        writer.write('\r\n'.join(head).encode('latin-1'))
+
+        if method != 'HEAD':
+            writer.write(body)
+
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve training stats as JSON over HTTP.")
+    parser.add_argument('data_dir', help="Directory holding <athlete>.yml files")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+    asyncio.run(StatsServer(args.data_dir).serve_forever(args.host, args.port))
@@ -0,0 +1,336 @@
+import pytest
+import yaml
+import tempfile
+import os
+import numpy as np
+from datetime import timedelta, timezone
+from src.stat_module import load_training_data, collect_all_stats
+from src.activity_import import (
+    parse_track_points,
+    haversine_km,
+    track_stats,
+    parse_activity_file,
+    parse_activity_files,
+    merge_sessions,
+    import_activity_files
+)
+
+
+GPX_CONTENT = """<?xml version="1.0" encoding="UTF-8"?>
+<gpx version="1.1" creator="test" xmlns="http://www.topografix.com/GPX/1/1">
+  <metadata><time>2025-01-14T07:00:00Z</time></metadata>
+  <trk>
+    <name>Morning trail</name>
+    <type>trail_running</type>
+    <trkseg>
+      <trkpt lat="45.00" lon="6.00"><ele>1000</ele><time>2025-01-14T07:00:00Z</time></trkpt>
+      <trkpt lat="45.01" lon="6.00"><ele>1050</ele><time>2025-01-14T07:10:00Z</time></trkpt>
+      <trkpt lat="45.02" lon="6.00"><ele>1030</ele><time>2025-01-14T07:20:00Z</time></trkpt>
+      <trkpt lat="45.03" lon="6.00"><ele>1100</ele><time>2025-01-14T07:30:00Z</time></trkpt>
+    </trkseg>
+  </trk>
+</gpx>
+"""
+
+TCX_CONTENT = """<?xml version="1.0" encoding="UTF-8"?>
+<TrainingCenterDatabase xmlns="http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2">
+  <Activities>
+    <Activity Sport="Biking">
+      <Id>2025-01-16T17:00:00Z</Id>
+      <Lap StartTime="2025-01-16T17:00:00Z">
+        <Track>
+          <Trackpoint>
+            <Time>2025-01-16T17:00:00Z</Time>
+            <Position><LatitudeDegrees>45.0</LatitudeDegrees><LongitudeDegrees>6.0</LongitudeDegrees></Position>
+            <AltitudeMeters>200</AltitudeMeters>
+          </Trackpoint>
+          <Trackpoint>
+            <Time>2025-01-16T17:30:00Z</Time>
+          </Trackpoint>
+          <Trackpoint>
+            <Time>2025-01-16T18:00:00Z</Time>
+            <Position><LatitudeDegrees>45.1</LatitudeDegrees><LongitudeDegrees>6.0</LongitudeDegrees></Position>
+            <AltitudeMeters>260</AltitudeMeters>
+          </Trackpoint>
+        </Track>
+      </Lap>
+      <Notes>Easy ride</Notes>
+    </Activity>
+  </Activities>
+</TrainingCenterDatabase>
+"""
+
+# 0.01 degree of latitude on the sphere used by haversine_km
+STEP_KM = 6371.0088 * np.radians(0.01)
+
+
+class TestParsing:
+    """Test suite for GPX/TCX parsing and track statistics."""
+
+    def setup_method(self):
+        """Write the test export files."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.gpx = os.path.join(self.tmpdir.name, 'trail.gpx')
+        self.tcx = os.path.join(self.tmpdir.name, 'ride.tcx')
+
+        with open(self.gpx, 'w', encoding='utf-8') as f:
+            f.write(GPX_CONTENT)
+
+        with open(self.tcx, 'w', encoding='utf-8') as f:
+            f.write(TCX_CONTENT)
+
+    def teardown_method(self):
+        """Remove the test export files."""
+        self.tmpdir.cleanup()
+
+    def test_parse_gpx_points(self):
+        """Test GPX track points, name and type are read."""
+        points = parse_track_points(self.gpx)
+
+        assert points['name'] == 'Morning trail'
+        assert points['sport'] == 'trail_running'
+        assert len(points['lat']) == 4
+        assert points['ele'].tolist() == [1000, 1050, 1030, 1100]
+        assert points['time'][-1] - points['time'][0] == 1800
+
+    def test_parse_gpx_name_ignores_author(self):
+        """Test the author name is never used, the metadata name only as fallback."""
+        path = os.path.join(self.tmpdir.name, 'named.gpx')
+        content = GPX_CONTENT.replace(
+            '<metadata>', '<metadata><name>Export</name><author><name>Bob</name></author>')
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+        assert parse_track_points(path)['name'] == 'Morning trail'
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content.replace('<name>Morning trail</name>', ''))
+
+        assert parse_track_points(path)['name'] == 'Export'
+
+    def test_parse_tcx_points(self):
+        """Test TCX track points, including one without position."""
+        points = parse_track_points(self.tcx)
+
+        assert points['name'] == 'Easy ride'
+        assert points['sport'] == 'Biking'
+        assert len(points['time']) == 3
+        assert np.isnan(points['lat'][1])
+        assert np.isnan(points['ele'][1])
+
+    def test_haversine(self):
+        """Test vectorized haversine distances."""
+        result = haversine_km(np.array([45.0, 45.01, 45.01]), np.array([6.0, 6.0, 6.0]))
+
+        assert result == pytest.approx([STEP_KM, 0.0])
+
+    def test_track_stats_gpx(self):
+        """Test distance, positive elevation gain and duration."""
+        stats = track_stats(parse_track_points(self.gpx))
+
+        assert stats['distance_km'] == pytest.approx(3 * STEP_KM)
+        assert stats['elevation_m'] == pytest.approx(120)  # 50 + 70
+        assert stats['time_min'] == pytest.approx(30)
+
+    def test_track_stats_skip_missing_values(self):
+        """Test points without position or elevation are skipped."""
+        stats = track_stats(parse_track_points(self.tcx))
+
+        assert stats['distance_km'] == pytest.approx(10 * STEP_KM)
+        assert stats['elevation_m'] == pytest.approx(60)
+        assert stats['time_min'] == pytest.approx(60)
+
+    def test_parse_activity_file(self):
+        """Test conversion to a session of the training schema."""
+        activity, session = parse_activity_file(self.tcx)
+
+        assert activity == 'bike'
+        assert session['session_description'] == 'Easy ride'
+        assert session['start_time'] == '2025-01-16T17:00:00Z'
+        assert session['time_min'] == 60
+        assert session['elevation_m'] == 60
+
+    def test_parse_activity_file_without_points(self):
+        """Test a file without track points yields no session."""
+        path = os.path.join(self.tmpdir.name, 'empty.gpx')
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('<gpx xmlns="http://www.topografix.com/GPX/1/1"><trk><trkseg/></trk></gpx>')
+
+        assert parse_activity_file(path) is None
+
+    def test_parse_activity_files_in_parallel(self):
+        """Test parallel parsing keeps the order of the files."""
+        results, failures = parse_activity_files([self.gpx, self.tcx], max_workers=2)
+
+        assert [activity for activity, _ in results] == ['trail_running', 'bike']
+        assert failures == []
+        assert (results, failures) == parse_activity_files([self.gpx, self.tcx], max_workers=1)
+
+    def test_parse_activity_files_skips_failing_files(self):
+        """Test malformed or missing files are reported without stopping the others."""
+        bad = os.path.join(self.tmpdir.name, 'bad.gpx')
+        missing = os.path.join(self.tmpdir.name, 'missing.tcx')
+
+        with open(bad, 'w', encoding='utf-8') as f:
+            f.write('not xml at all')
+
+        for workers in (1, 2):
+            results, failures = parse_activity_files([self.gpx, bad, missing, self.tcx], workers)
+
+            assert [activity for activity, _ in results] == ['trail_running', 'bike']
+            assert [path for path, _ in failures] == [bad, missing]
+            assert failures[0][1].startswith('ParseError')
+
+    def test_parse_activity_files_reports_files_without_time(self):
+        """Test files without timestamped points are reported, not silently dropped."""
+        path = os.path.join(self.tmpdir.name, 'notime.gpx')
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(GPX_CONTENT.replace('<time>', '<desc>').replace('</time>', '</desc>'))
+
+        assert parse_activity_files([path]) == ([], [(path, 'no timestamped track points')])
+
+    def test_parse_activity_files_rejects_other_extensions(self):
+        """Test files other than .gpx/.tcx are rejected before parsing."""
+        with pytest.raises(ValueError, match='activity.fit'):
+            parse_activity_files([self.gpx, os.path.join(self.tmpdir.name, 'activity.fit')])
+
+
+class TestMergeSessions:
+    """Test suite for merging imported sessions into weeks."""
+
+    def setup_method(self):
+        """Set up existing weeks and imported sessions."""
+        self.weeks = [
+            {
+                'week_first_day': '2025-01-13',
+                'trail_running': [{'session_description': 'Trail', 'time_min': 124}]
+            }
+        ]
+        self.sessions = [
+            ('trail_running', {'start_time': '2025-01-14T07:00:00Z', 'time_min': 30}),
+            ('bike', {'start_time': '2025-01-21T17:00:00Z', 'time_min': 60}),
+        ]
+
+    def test_merge_into_existing_and_new_weeks(self):
+        """Test sessions go to the week starting on their Monday."""
+        weeks, added = merge_sessions(self.weeks, self.sessions)
+
+        assert added == 2
+        assert [w['week_first_day'] for w in weeks] == ['2025-01-13', '2025-01-20']
+        assert len(weeks[0]['trail_running']) == 2
+        assert weeks[1]['bike'][0]['time_min'] == 60
+
+    def test_merge_does_not_modify_input(self):
+        """Test the input weeks are left unmodified."""
+        merge_sessions(self.weeks, self.sessions)
+
+        assert len(self.weeks) == 1
+        assert len(self.weeks[0]['trail_running']) == 1
+
+    def test_merge_keeps_weeks_sharing_a_first_day(self):
+        """Test weeks with the same first day are all kept."""
+        weeks = self.weeks + [
+            {'week_first_day': '2025-01-13', 'bike': [{'time_min': 45}]}
+        ]
+        merged, added = merge_sessions(weeks, self.sessions[:1])
+
+        assert added == 1
+        assert [w['week_first_day'] for w in merged] == ['2025-01-13', '2025-01-13']
+        assert len(merged[0]['trail_running']) == 2
+        assert merged[1] == {'week_first_day': '2025-01-13', 'bike': [{'time_min': 45}]}
+
+    def test_merge_uses_local_start_date(self):
+        """Test sessions are assigned to weeks by their local start date."""
+        sunday_evening = ('footing', {'start_time': '2025-01-20T02:00:00Z', 'time_min': 40})
+        monday_night = ('footing', {'start_time': '2025-01-19T23:30:00Z', 'time_min': 30})
+
+        weeks, _ = merge_sessions([], [sunday_evening], tz=timezone(timedelta(hours=-5)))
+        assert weeks[0]['week_first_day'] == '2025-01-13'
+
+        weeks, _ = merge_sessions([], [monday_night], tz=timezone(timedelta(hours=1)))
+        assert weeks[0]['week_first_day'] == '2025-01-20'
+        assert weeks[0]['footing'][0]['start_time'] == '2025-01-19T23:30:00Z'
+
+    def test_merge_deduplicates(self):
+        """Test already imported sessions are skipped."""
+        weeks, _ = merge_sessions(self.weeks, self.sessions)
+        weeks, added = merge_sessions(weeks, self.sessions + self.sessions[:1])
+
+        assert added == 0
+        assert len(weeks[0]['trail_running']) == 2
+
+    def test_merged_weeks_feed_collect_all_stats(self):
+        """Test merged weeks are consumed by collect_all_stats."""
+        weeks, _ = merge_sessions(self.weeks, self.sessions)
+        df = collect_all_stats(weeks)
+
+        assert df.iloc[0]['trail_running_time_min'] == 154  # 124 + 30
+        assert df.iloc[1]['bike_time_min'] == 60
+
+
+class TestImportActivityFiles:
+    """Integration tests for importing files into a YAML file."""
+
+    def test_import_twice_into_yaml(self):
+        """Test importing writes loadable YAML and skips duplicates."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            gpx = os.path.join(tmpdir, 'trail.gpx')
+            yaml_path = os.path.join(tmpdir, 'athlete.yml')
+
+            with open(gpx, 'w', encoding='utf-8') as f:
+                f.write(GPX_CONTENT)
+
+            with open(yaml_path, 'w', encoding='utf-8') as f:
+                yaml.dump({'data': [{'week_first_day': '2025-01-06'}]}, f)
+
+            assert import_activity_files(yaml_path, [gpx]) == (1, [])
+            assert import_activity_files(yaml_path, [gpx]) == (0, [])
+            weeks = load_training_data(yaml_path)
+
+            assert [w['week_first_day'] for w in weeks] == ['2025-01-06', '2025-01-13']
+            assert weeks[1]['trail_running'][0]['distance_km'] == round(3 * STEP_KM, 2)
+
+    def test_import_creates_file_with_umask_mode(self):
+        """Test a new YAML file gets the umask-based mode, not mkstemp's 0600."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            gpx = os.path.join(tmpdir, 'trail.gpx')
+            yaml_path = os.path.join(tmpdir, 'new.yml')
+
+            with open(gpx, 'w', encoding='utf-8') as f:
+                f.write(GPX_CONTENT)
+            previous = os.umask(0o022)
+
+            try:
+                import_activity_files(yaml_path, [gpx])
+            finally:
+                os.umask(previous)
+
+            assert os.stat(yaml_path).st_mode & 0o777 == 0o644
+
+    def test_import_keeps_other_top_level_keys(self):
+        """Test only the 'data' key is replaced and no temporary file is left."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            gpx = os.path.join(tmpdir, 'trail.gpx')
+            yaml_path = os.path.join(tmpdir, 'athlete.yml')
+
+            with open(gpx, 'w', encoding='utf-8') as f:
+                f.write(GPX_CONTENT)
+
+            with open(yaml_path, 'w', encoding='utf-8') as f:
+                yaml.dump({'athlete': {'name': 'Bob'}, 'data': []}, f)
+
+            assert import_activity_files(yaml_path, [gpx]) == (1, [])
+
+            with open(yaml_path, 'r', encoding='utf-8') as f:
+                document = yaml.safe_load(f)
+
+            assert document['athlete'] == {'name': 'Bob'}
+            assert len(document['data']) == 1
+            assert sorted(os.listdir(tmpdir)) == ['athlete.yml', 'trail.gpx']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,254 @@
+import pytest
+from datetime import date
+from src.query_engine import (
+    AggregateIndex,
+    parse_query,
+    execute_query,
+    answer_question,
+    TOTAL
+)
+
+
+WEEKS = [
+    {
+        'week_first_day': '2025-01-13',
+        'trail_running': [{'distance_km': 20.0, 'elevation_m': 416, 'time_min': 124, 'load': 203}],
+        'footing': [{'distance_km': 23.0, 'elevation_m': 320, 'time_min': 136, 'load': 250}]
+    },
+    {
+        'week_first_day': '2024-12-30',
+        'trail_running': [{'distance_km': 16.5, 'elevation_m': 319, 'time_min': 92, 'load': 189}],
+        'others': [{'time_min': 61}]
+    },
+    {
+        'week_first_day': '2025-01-20',
+        'trail_running': [{'distance_km': 81.5, 'elevation_m': 871, 'time_min': 876, 'load': 1051}],
+        'footing': [{'distance_km': 16.0, 'elevation_m': 34, 'time_min': 94, 'load': 180}]
+    },
+    {
+        'week_first_day': '2025-02-17',
+        'trail_running_race': [{'distance_km': 70, 'elevation_m': 2500, 'time_min': 600, 'load': 784}]
+    },
+    {
+        'week_first_day': '2025-02-24'
+    }
+]
+
+
+class TestAggregateIndex:
+    """Test suite for the AggregateIndex class."""
+
+    def setup_method(self):
+        """Build the index over the test weeks."""
+        self.index = AggregateIndex(WEEKS)
+
+    def test_weeks_sorted_by_date(self):
+        """Test weeks are indexed in chronological order."""
+        assert self.index.dates[0] == date(2024, 12, 30)
+        assert self.index.dates[-1] == date(2025, 2, 24)
+        assert self.index.activities == ['footing', 'others', 'trail_running', 'trail_running_race']
+
+    def test_range_total_all_weeks(self):
+        """Test totals over the full range."""
+        assert self.index.range_total(['trail_running'], 'load') == 1443  # 203 + 189 + 1051
+        assert self.index.range_total([TOTAL], 'time_min') == 1983
+
+    def test_range_total_inclusive_bounds(self):
+        """Test range bounds are inclusive and match week first days."""
+        total = self.index.range_total(['footing'], 'distance_km', date(2025, 1, 13), date(2025, 1, 20))
+
+        assert total == 39.0  # 23.0 + 16.0
+
+    def test_range_total_empty_range(self):
+        """Test a range without weeks sums to zero."""
+        assert self.index.range_total([TOTAL], 'load', date(2025, 3, 1), date(2025, 3, 31)) == 0
+        assert self.index.range_total([TOTAL], 'load', date(2025, 2, 1), date(2025, 1, 1)) == 0
+
+    def test_weeks_matching_comparisons(self):
+        """Test threshold queries with each comparison."""
+        assert self.index.weeks_matching([TOTAL], 'load', '>', 1000) == [date(2025, 1, 20)]
+        assert self.index.weeks_matching([TOTAL], 'load', '>=', 784) == [date(2025, 1, 20), date(2025, 2, 17)]
+        assert self.index.weeks_matching([TOTAL], 'load', '<', 189) == [date(2025, 2, 24)]
+        assert self.index.weeks_matching([TOTAL], 'load', '<=', 189) == [date(2024, 12, 30), date(2025, 2, 24)]
+
+    def test_weeks_matching_activity_group_and_range(self):
+        """Test threshold queries over several activities within a date range."""
+        group = ['trail_running', 'trail_running_race']
+        result = self.index.weeks_matching(group, 'elevation_m', '>', 400, start=date(2025, 1, 14))
+
+        assert result == [date(2025, 1, 20), date(2025, 2, 17)]
+
+    def test_weeks_matching_unknown_comparison(self):
+        """Test an unknown comparison raises ValueError."""
+        with pytest.raises(ValueError):
+            self.index.weeks_matching([TOTAL], 'load', '!=', 0)
+
+    def test_empty_index(self):
+        """Test an index without weeks."""
+        index = AggregateIndex([])
+
+        assert index.range_total([TOTAL], 'load') == 0
+        assert index.weeks_matching([TOTAL], 'load', '>', 0) == []
+
+
+class TestParseQuery:
+    """Test suite for the rule-based question parser."""
+
+    def setup_method(self):
+        """Build the index over the test weeks."""
+        self.index = AggregateIndex(WEEKS)
+
+    def test_parse_total_with_activity_prefix_and_month(self):
+        """Test an activity prefix selects all matching activities."""
+        query = parse_query("Total trail elevation in January", self.index)
+
+        assert query['op'] == 'total'
+        assert query['activities'] == ['trail_running', 'trail_running_race']
+        assert query['metric'] == 'elevation_m'
+        assert (query['start'], query['end']) == (date(2025, 1, 1), date(2025, 1, 31))
+
+    def test_parse_full_activity_name(self):
+        """Test a full activity name selects that activity only."""
+        query = parse_query("total trail running distance", self.index)
+
+        assert query['activities'] == ['trail_running']
+        assert query['start'] is None and query['end'] is None
+
+    def test_parse_sport_words(self):
+        """Test sport words and verbs select activities by name part."""
+        running = ['footing', 'trail_running', 'trail_running_race']
+
+        assert parse_query("total running distance", self.index)['activities'] == running
+        assert parse_query("weeks where I ran more than 20 km", self.index)['activities'] == running
+        assert parse_query("total race elevation", self.index)['activities'] == ['trail_running_race']
+
+    def test_parse_unknown_sport(self):
+        """Test a sport missing from the index raises ValueError."""
+        with pytest.raises(ValueError):
+            parse_query("total swimming time", self.index)
+
+    def test_parse_month_picks_latest_year(self):
+        """Test a month without year resolves to its latest occurrence in the data."""
+        query = parse_query("total load in december", self.index)
+
+        assert (query['start'], query['end']) == (date(2024, 12, 1), date(2024, 12, 31))
+
+    def test_parse_explicit_periods(self):
+        """Test explicit years, ISO ranges and open bounds."""
+        assert parse_query("total load in 2024", self.index)['end'] == date(2024, 12, 31)
+        query = parse_query("total load between 2025-01-01 and 2025-01-15", self.index)
+        assert (query['start'], query['end']) == (date(2025, 1, 1), date(2025, 1, 15))
+        assert parse_query("total load since 2025-02-01", self.index)['start'] == date(2025, 2, 1)
+        assert parse_query("total load feb 2025", self.index)['end'] == date(2025, 2, 28)
+
+    def test_parse_ambiguous_month_words(self):
+        """Test abbreviations and "may" need "in" or a year to name a month."""
+        query = parse_query("what I may have run in total distance", self.index)
+        assert (query['start'], query['end']) == (None, None)
+        assert parse_query("total load dec", self.index)['start'] is None
+        assert parse_query("total load in may", self.index)['start'].month == 5
+        assert parse_query("total load mar 2025", self.index)['start'] == date(2025, 3, 1)
+        assert parse_query("total load december", self.index)['start'] == date(2024, 12, 1)
+
+    def test_parse_open_ended_month_periods(self):
+        """Test range keywords followed by a month give open-ended ranges."""
+        query = parse_query("total time since January", self.index)
+        assert (query['start'], query['end']) == (date(2025, 1, 1), None)
+        query = parse_query("total time after january 2025", self.index)
+        assert (query['start'], query['end']) == (date(2025, 2, 1), None)
+        query = parse_query("total time until december", self.index)
+        assert (query['start'], query['end']) == (None, date(2024, 12, 31))
+        query = parse_query("total time before feb 2025", self.index)
+        assert (query['start'], query['end']) == (None, date(2025, 1, 31))
+        query = parse_query("total time between december and february", self.index)
+        assert (query['start'], query['end']) == (date(2024, 12, 1), date(2025, 2, 28))
+
+    def test_parse_range_end_follows_start(self):
+        """Test a yearless end month is its next occurrence from the start."""
+        query = parse_query("total load between february and december", self.index)
+        assert (query['start'], query['end']) == (date(2025, 2, 1), date(2025, 12, 31))
+        query = parse_query("total load from march to january", self.index)
+        assert (query['start'], query['end']) == (date(2025, 3, 1), date(2026, 1, 31))
+
+    def test_parse_inverted_range(self):
+        """Test a range ending before it starts raises ValueError."""
+        with pytest.raises(ValueError):
+            parse_query("total load between 2025-02-01 and 2025-01-01", self.index)
+
+        with pytest.raises(ValueError):
+            parse_query("total load from jan 2025 to dec 2024", self.index)
+
+    def test_parse_range_keyword_without_period(self):
+        """Test a range keyword without date or month raises ValueError."""
+        with pytest.raises(ValueError):
+            parse_query("total time since last race", self.index)
+
+    def test_parse_threshold(self):
+        """Test threshold questions."""
+        query = parse_query("weeks above 1000 load", self.index)
+
+        assert query['op'] == 'weeks'
+        assert query['activities'] == [TOTAL]
+        assert (query['comparison'], query['value']) == ('>', 1000)
+
+    def test_parse_threshold_with_thousands_separator(self):
+        """Test thousands separators are read, malformed ones rejected."""
+        assert parse_query("weeks above 1,000 load", self.index)['value'] == 1000
+
+        with pytest.raises(ValueError):
+            parse_query("weeks above 1,00 load", self.index)
+
+    def test_parse_comparison_whole_words(self):
+        """Test comparison words are not matched inside other words."""
+        with pytest.raises(ValueError):
+            parse_query("weeks moreover 5 km", self.index)
+
+        with pytest.raises(ValueError):
+            parse_query("weeks of thunder 5 km", self.index)
+
+    def test_parse_threshold_in_hours(self):
+        """Test hours are converted to minutes."""
+        query = parse_query("weeks with at least 2 hours of footing", self.index)
+
+        assert query['metric'] == 'time_min'
+        assert (query['comparison'], query['value']) == ('>=', 120)
+
+    def test_parse_without_metric(self):
+        """Test a question without metric raises ValueError."""
+        with pytest.raises(ValueError):
+            parse_query("how was january?", self.index)
+
+    def test_parse_weeks_without_threshold(self):
+        """Test a week question without threshold raises ValueError."""
+        with pytest.raises(ValueError):
+            parse_query("weeks of load", self.index)
+
+
+class TestAnswerQuestion:
+    """Integration tests from question to answer."""
+
+    def setup_method(self):
+        """Build the index over the test weeks."""
+        self.index = AggregateIndex(WEEKS)
+
+    def test_execute_total(self):
+        """Test executing a total query."""
+        query = parse_query("total trail elevation in january", self.index)
+
+        assert execute_query(query, self.index) == 1287  # 416 + 871
+
+    def test_execute_threshold(self):
+        """Test executing a threshold query."""
+        query = parse_query("weeks over 700 load", self.index)
+
+        assert execute_query(query, self.index) == [date(2025, 1, 20), date(2025, 2, 17)]
+
+    def test_answer_sentences(self):
+        """Test answers are readable sentences."""
+        assert answer_question("total footing km", self.index) == \
+            "Total distance_km for footing: 39"
+        assert answer_question("weeks above 5000 load", self.index).startswith("0 week(s)")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,321 @@
+import pytest
+import yaml
+import json
+import asyncio
+import tempfile
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from src.stats_server import (
+    compute_weekly,
+    compute_per_sport,
+    compute_range,
+    StatsServer
+)
+
+
+YAML_CONTENT = {
+    'data': [
+        {
+            'week_first_day': '2024-12-30',
+            'trail_running': [
+                {'distance_km': 16.5, 'elevation_m': 319, 'time_min': 92, 'load': 189}
+            ],
+            'others': [{'time_min': 61}]
+        },
+        {
+            'week_first_day': '2025-01-06',
+            'footing': [
+                {'distance_km': 10.4, 'elevation_m': 7, 'time_min': 54, 'load': 127}
+            ]
+        },
+        {
+            'week_first_day': '2025-01-13',
+            'week_comment': 'Raid',
+            'trail_running': [
+                {'distance_km': 20.0, 'elevation_m': 416, 'time_min': 124, 'load': 203}
+            ]
+        }
+    ]
+}
+
+
+def write_athlete(data_dir, athlete, content):
+    """Write an athlete YAML file into data_dir and return its path."""
+    path = os.path.join(data_dir, f"{athlete}.yml")
+
+    with open(path, 'w', encoding='utf-8') as f:
+        yaml.dump(content, f)
+
+    return path
+
+
+async def fetch(port, target, headers=None, method='GET'):
+    """Send one HTTP request to localhost and return (status, headers, body)."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    lines = [f"{method} {target} HTTP/1.1", "Host: localhost"]
+    lines += [f"{k}: {v}" for k, v in (headers or {}).items()]
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, body = raw.partition(b'\r\n\r\n')
+    head_lines = head.decode('latin-1').split('\r\n')
+    status = int(head_lines[0].split(' ')[1])
+    response_headers = {}
+
+    for line in head_lines[1:]:
+        name, _, value = line.partition(':')
+        response_headers[name.strip().lower()] = value.strip()
+
+    return status, response_headers, body
+
+
+class TestComputeFunctions:
+    """Test suite for the worker-side aggregation functions."""
+
+    def setup_method(self):
+        """Create a temporary athlete file."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = write_athlete(self.tmpdir.name, 'alice', YAML_CONTENT)
+
+    def teardown_method(self):
+        """Remove the temporary athlete file."""
+        self.tmpdir.cleanup()
+
+    def test_compute_weekly(self):
+        """Test weekly records are JSON-serializable and complete."""
+        result = compute_weekly(self.path)
+
+        assert len(result) == 3
+        assert result[0]['trail_running_time_min'] == 92
+        assert result[1]['footing_time_min'] == 54
+        assert result[2]['week_comment'] == 'Raid'
+        json.dumps(result)
+
+    def test_compute_per_sport(self):
+        """Test per-sport records include the TOTAL row."""
+        result = compute_per_sport(self.path)
+        rows = {r['activity']: r for r in result}
+
+        assert rows['trail_running']['time_min'] == 216  # 92 + 124
+        assert rows['TOTAL']['time_min'] == 331  # 92 + 61 + 54 + 124
+
+    def test_compute_range_bounds_inclusive(self):
+        """Test range filtering keeps weeks on both bounds."""
+        result = compute_range(self.path, date(2025, 1, 6), date(2025, 1, 13))
+
+        assert [w['week_first_day'] for w in result['weeks']] == ['2025-01-06', '2025-01-13']
+        total = [r for r in result['sports'] if r['activity'] == 'TOTAL'][0]
+        assert total['time_min'] == 178  # 54 + 124
+
+    def test_compute_range_open_bounds(self):
+        """Test a missing bound leaves the range open."""
+        result = compute_range(self.path, None, date(2024, 12, 31))
+
+        assert len(result['weeks']) == 1
+        assert result['start'] is None
+        assert result['end'] == '2024-12-31'
+
+    def test_compute_range_without_weeks(self):
+        """Test a range without any week gives no weeks and a zero TOTAL row."""
+        result = compute_range(self.path, date(2025, 1, 7), date(2025, 1, 8))
+
+        assert result['weeks'] == []
+        assert result['sports'] == [
+            {'activity': 'TOTAL', 'time_min': 0, 'distance_km': 0, 'elevation_m': 0, 'load': 0}
+        ]
+
+    def test_compute_on_empty_file(self):
+        """Test an empty file or weeks without activity give a zero TOTAL row."""
+        empty = write_athlete(self.tmpdir.name, 'empty', {'data': []})
+        idle = write_athlete(self.tmpdir.name, 'idle', {'data': [{'week_first_day': '2025-02-24'}]})
+
+        for path in (empty, idle):
+            assert compute_per_sport(path)[0]['activity'] == 'TOTAL'
+            assert compute_per_sport(path)[0]['load'] == 0
+        assert compute_weekly(empty) == []
+
+
+class TestStatsServer:
+    """Test suite for the HTTP service, run on localhost."""
+
+    def setup_method(self):
+        """Create a temporary data directory with one athlete."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = write_athlete(self.tmpdir.name, 'alice', YAML_CONTENT)
+
+    def teardown_method(self):
+        """Remove the temporary data directory."""
+        self.tmpdir.cleanup()
+
+    def run_with_server(self, scenario, executor_class=ThreadPoolExecutor):
+        """Start a server on a free port, run scenario(server, port) and stop it."""
+        executor = executor_class(max_workers=2)
+
+        async def main():
+            server = StatsServer(self.tmpdir.name, executor=executor)
+            _, port = await server.start('127.0.0.1', 0)
+
+            try:
+                return await scenario(server, port)
+            finally:
+                await server.close()
+
+        try:
+            return asyncio.run(main())
+        finally:
+            executor.shutdown()
+
+    def test_weekly_endpoint(self):
+        """Test weekly stats are served as JSON with an ETag."""
+        status, headers, body = self.run_with_server(
+            lambda server, port: fetch(port, '/athletes/alice/weekly'))
+
+        assert status == 200
+        assert headers['content-type'] == 'application/json'
+        assert 'etag' in headers
+        assert len(json.loads(body)) == 3
+
+    def test_sports_endpoint(self):
+        """Test per-sport totals endpoint."""
+        status, _, body = self.run_with_server(
+            lambda server, port: fetch(port, '/athletes/alice/sports'))
+        rows = {r['activity']: r for r in json.loads(body)}
+
+        assert status == 200
+        assert rows['TOTAL']['load'] == 519  # 189 + 127 + 203
+
+    def test_range_endpoint(self):
+        """Test date-range endpoint."""
+        status, _, body = self.run_with_server(
+            lambda server, port: fetch(port, '/athletes/alice/range?start=2025-01-01'))
+        result = json.loads(body)
+
+        assert status == 200
+        assert len(result['weeks']) == 2
+
+    def test_range_invalid_date(self):
+        """Test invalid or inverted dates return 400."""
+        async def scenario(server, port):
+            bad = await fetch(port, '/athletes/alice/range?start=january')
+            inverted = await fetch(port, '/athletes/alice/range?start=2025-02-01&end=2025-01-01')
+
+            return bad[0], inverted[0]
+
+        assert self.run_with_server(scenario) == (400, 400)
+
+    def test_unknown_athlete_and_route(self):
+        """Test unknown athletes, unsafe names and routes return 404."""
+        async def scenario(server, port):
+            return [
+                (await fetch(port, '/athletes/bob/weekly'))[0],
+                (await fetch(port, '/athletes/..%2Falice/weekly'))[0],
+                (await fetch(port, '/unknown'))[0],
+            ]
+
+        assert self.run_with_server(scenario) == [404, 404, 404]
+
+    def test_empty_range_and_file(self):
+        """Test an empty range and an empty file are answered with 200."""
+        write_athlete(self.tmpdir.name, 'empty', {'data': []})
+
+        async def scenario(server, port):
+            return [
+                await fetch(port, '/athletes/alice/range?start=2030-01-01'),
+                await fetch(port, '/athletes/empty/sports'),
+            ]
+
+        results = self.run_with_server(scenario)
+
+        assert [r[0] for r in results] == [200, 200]
+        assert json.loads(results[0][2])['weeks'] == []
+        assert json.loads(results[1][2])[0]['activity'] == 'TOTAL'
+
+    def test_internal_error_hides_details(self):
+        """Test unexpected errors return a generic 500 message."""
+        with open(os.path.join(self.tmpdir.name, 'broken.yml'), 'w', encoding='utf-8') as f:
+            f.write('invalid_key: []')
+
+        status, _, body = self.run_with_server(
+            lambda server, port: fetch(port, '/athletes/broken/weekly'))
+
+        assert status == 500
+        assert json.loads(body) == {'error': 'Internal server error'}
+
+    def test_method_not_allowed(self):
+        """Test non-GET methods return 405."""
+        status, _, _ = self.run_with_server(
+            lambda server, port: fetch(port, '/athletes/alice/weekly', method='POST'))
+
+        assert status == 405
+
+    def test_if_none_match_returns_304(self):
+        """Test a matching If-None-Match header returns 304 without a body."""
+        async def scenario(server, port):
+            _, headers, _ = await fetch(port, '/athletes/alice/weekly')
+
+            return await fetch(port, '/athletes/alice/weekly', {'If-None-Match': headers['etag']})
+
+        status, _, body = self.run_with_server(scenario)
+
+        assert status == 304
+        assert body == b''
+
+    def test_cache_invalidated_on_file_change(self):
+        """Test a modified athlete file yields fresh stats and a new ETag."""
+        async def scenario(server, port):
+            first = await fetch(port, '/athletes/alice/weekly')
+            content = {'data': YAML_CONTENT['data'][:1]}
+            write_athlete(self.tmpdir.name, 'alice', content)
+            st = os.stat(self.path)
+            os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+            second = await fetch(port, '/athletes/alice/weekly',
+                                 {'If-None-Match': first[1]['etag']})
+
+            return first, second
+
+        first, second = self.run_with_server(scenario)
+
+        assert second[0] == 200
+        assert second[1]['etag'] != first[1]['etag']
+        assert len(json.loads(second[2])) == 1
+
+    def test_concurrent_requests_share_computation(self):
+        """Test identical concurrent requests are computed once."""
+        calls = []
+
+        class CountingExecutor(ThreadPoolExecutor):
+            def submit(self, fn, *args, **kwargs):
+                calls.append(fn)
+
+                return super().submit(fn, *args, **kwargs)
+
+        async def scenario(server, port):
+            return await asyncio.gather(*[fetch(port, '/athletes/alice/sports') for _ in range(5)])
+
+        results = self.run_with_server(scenario, executor_class=CountingExecutor)
+
+        assert all(r[0] == 200 for r in results)
+        assert len({r[1]['etag'] for r in results}) == 1
+        assert len(calls) == 1
+
+    def test_default_process_pool(self):
+        """Test the server works with its default process pool."""
+        async def main():
+            server = StatsServer(self.tmpdir.name)
+            _, port = await server.start('127.0.0.1', 0)
+
+            try:
+                return await fetch(port, '/athletes/alice/weekly')
+            finally:
+                await server.close()
+
+        status, _, body = asyncio.run(main())
+
+        assert status == 200
+        assert len(json.loads(body)) == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])